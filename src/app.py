@@ -2,16 +2,15 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 from news_scraper import fetch_news
 from ner_analyzer import extract_entities, get_top_entities
 from sentiment_analyzer import get_sentiment, label_sentiment
 from geo_visualizer import create_geo_map
-from utils import process_news
+from utils import process_news, compute_entity_sentiment
 import logging
-from cachetools import TTLCache
 import time
 import re
+from collections import Counter
 
 # Configure logging
 logging.basicConfig(
@@ -21,8 +20,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize cache (TTL of 5 minutes)
-cache = TTLCache(maxsize=100, ttl=300)
+# Line breaks inside entity names, collapsed before building the word cloud
+NEWLINE_RE = re.compile(r'[\n\r]+')
 
 # Streamlit configuration
 st.set_page_config(page_title="NewsPulse: Indian News Insights", layout="wide", initial_sidebar_state="expanded")
@@ -77,76 +76,116 @@ st.markdown("""
 st.sidebar.header("🔍 News Filters")
 query = st.sidebar.text_input("Search Query (e.g., 'Indian stock market')", "")
 period = st.sidebar.selectbox("Time Period", ["1h", "1d", "2d", "3d", "7d"], index=1)
-entity_type = st.sidebar.multiselect("Entity Types", ["PERSON", "ORG", "GPE", "EVENT"], default=["PERSON", "ORG", "GPE", "EVENT"])
+use_full_text = st.sidebar.checkbox("Analyze full article text", value=True, help="When off, articles with a long enough description are not downloaded")
 
-# Cache key
-cache_key = f"india_news_{query}_{period}"
+# Fetching and NLP processing are cached together for 5 minutes per set of filters
+@st.cache_data(ttl=300, show_spinner=False)
+def get_news_and_entities(query, period, use_full_text):
+    start_time = time.time()
+    news_df = fetch_news(query=query, period=period, min_articles=30, use_full_text=use_full_text)
+    logger.info("Fetched %d Indian news articles in %.2f seconds", len(news_df), time.time() - start_time)
+    if news_df.empty:
+        return news_df, []
+    return process_news(news_df)
 
-@st.cache_data(show_spinner=False)
-def get_cached_news(query, period):
-    try:
-        start_time = time.time()
-        news_df = fetch_news(query=query, period=period, min_articles=30)
-        logger.info(f"Fetched {len(news_df)} Indian news articles in {time.time() - start_time:.2f} seconds")
-        return news_df
-    except Exception as e:
-        logger.error(f"Error fetching news: {str(e)}")
-        st.error("Failed to fetch news. Please try again later or check your internet connection.")
-        return pd.DataFrame()
+# Rendered charts are cached on their input so unrelated widget changes reuse them;
+# they expire with the data they were drawn from and only a few are kept in memory
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def build_wordcloud_image(frequency_items):
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color="white",
+        font_path=None,
+        min_font_size=10,
+        max_font_size=150,
+        prefer_horizontal=1.0  # Skips the rotated-word layout search
+    ).generate_from_frequencies(dict(frequency_items))
+    return wordcloud.to_array()
+
+@st.cache_data(ttl=300, max_entries=32, show_spinner=False)
+def build_entity_bar_chart(entity_items):
+    entity_freq = pd.DataFrame(list(entity_items), columns=["Entity", "Frequency"])
+    return alt.Chart(entity_freq).mark_bar().encode(
+        x=alt.X("Frequency:Q", title="Frequency"),
+        y=alt.Y("Entity:N", sort="-x", title="Entity"),
+        tooltip=["Entity", "Frequency"],
+        color=alt.Color("Frequency:Q", scale=alt.Scale(scheme="blues"))
+    ).properties(height=400, title="Top 20 Named Entities").to_dict()
+
+def truncate_text(series, max_length):
+    # Vectorized Arrow string kernels instead of a per-row Python callback
+    text = series.astype('string[pyarrow]')
+    return text.where(text.str.len().fillna(0) <= max_length, text.str.slice(0, max_length) + '...')
+
+# Entity sections re-run on their own when the entity type filter changes
+@st.fragment
+def render_entity_sections(news_df, entities):
+    entity_type = st.multiselect("Entity Types", ["PERSON", "ORG", "GPE", "EVENT"], default=["PERSON", "ORG", "GPE", "EVENT"])
+
+    # Top Entities Word Cloud
+    st.subheader("☁️ Top Entities Word Cloud")
+    filtered_entities = [e for e in entities if e[1] in entity_type]
+    entity_counts = Counter(filtered_entities)
+    cleaned_entity_counts = {}
+    for (entity, _), count in entity_counts.items():
+        key = NEWLINE_RE.sub(' ', entity).strip()
+        cleaned_entity_counts[key] = cleaned_entity_counts.get(key, 0) + count
+    if cleaned_entity_counts:
+        try:
+            wordcloud_image = build_wordcloud_image(tuple(sorted(cleaned_entity_counts.items())))
+            st.image(wordcloud_image, use_column_width=True)
+        except Exception as e:
+            logger.error("Error generating word cloud: %s", e)
+            st.warning("Unable to generate word cloud due to text rendering issues.")
+    else:
+        st.warning("No entities found for the selected filters.")
+
+    # Unified Named Entity Explorer
+    st.subheader("🧠 Named Entity Explorer")
+    st.markdown("Explore all named entities (people, organizations, locations, events) in India's top news, stock market updates, and events.")
+    # Only the 20 most frequent entities are shown, so only they need sentiment lookups
+    top_entity_counts = entity_counts.most_common(20)
+    entity_sentiment = compute_entity_sentiment(news_df, [key for key, _ in top_entity_counts])
+    entity_df = pd.DataFrame({
+        'Entity': [entity for (entity, _), _ in top_entity_counts],
+        'Type': [etype for (_, etype), _ in top_entity_counts],
+        'Frequency': [freq for _, freq in top_entity_counts],
+        'Avg Sentiment': [round(entity_sentiment.get(key, 0.0), 3) for key, _ in top_entity_counts]
+    })
+    st.dataframe(entity_df, use_container_width=True)
+
+    # Entity Frequency Chart
+    st.subheader("📈 Top Named Entities")
+    top_entities = get_top_entities(filtered_entities, top_n=20)
+    if top_entities:
+        st.vega_lite_chart(build_entity_bar_chart(tuple(top_entities)), use_container_width=True)
+    else:
+        st.warning("No entities match the selected filters.")
 
 # Fetch and process news
 with st.spinner("Fetching and analyzing top Indian news..."):
-    if cache_key not in cache:
-        news_df = get_cached_news(query, period)
-        if not news_df.empty:
-            try:
-                news_df, entities = process_news(news_df)
-                cache[cache_key] = (news_df, entities)
-            except Exception as e:
-                logger.error(f"Error processing news: {str(e)}")
-                st.error("Failed to process news data. Please check logs for details.")
-                news_df, entities = pd.DataFrame(), []
-        else:
-            logger.warning("No news data fetched; initializing empty DataFrame")
-            news_df, entities = pd.DataFrame(columns=['title', 'desc', 'date', 'link', 'media', 'full_text', 'sentiment', 'sentiment_score']), []
-    else:
-        news_df, entities = cache[cache_key]
-        logger.info(f"Retrieved {len(news_df)} articles from cache for key {cache_key}")
+    try:
+        news_df, entities = get_news_and_entities(query, period, use_full_text)
+    except Exception as e:
+        logger.error("Error fetching news: %s", e)
+        st.error("Failed to fetch news. Please try again later or check your internet connection.")
+        news_df, entities = pd.DataFrame(), []
+    if news_df.empty:
+        logger.warning("No news data fetched; initializing empty DataFrame")
+        news_df, entities = pd.DataFrame(columns=['title', 'desc', 'date', 'link', 'media', 'full_text', 'sentiment', 'sentiment_score']), []
 
 # Log DataFrame contents for debugging
-logger.info(f"news_df shape: {news_df.shape}")
-if not news_df.empty:
-    logger.info(f"news_df columns: {list(news_df.columns)}")
-    logger.info(f"news_df sample: {news_df[['title', 'desc', 'date', 'sentiment']].head().to_dict()}")
+logger.info("news_df shape: %s", news_df.shape)
+# The sample dump builds a dict of the first rows, so skip it entirely when INFO is off
+if not news_df.empty and logger.isEnabledFor(logging.INFO):
+    logger.info("news_df columns: %s", list(news_df.columns))
+    logger.info("news_df sample: %s", news_df[['title', 'desc', 'date', 'sentiment']].head().to_dict())
 
 # Display results
-# Top Entities Word Cloud (First Section)
-st.subheader("☁️ Top Entities Word Cloud")
-cleaned_entity_counts = {
-    re.sub(r'[\n\r]+', ' ', k).strip(): v for k, v in 
-    {e[0]: entities.count(e) for e in entities if e[1] in entity_type}.items()
-}
-if cleaned_entity_counts:
-    try:
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color="white",
-            font_path=None,
-            min_font_size=10,
-            max_font_size=150
-        ).generate_from_frequencies(cleaned_entity_counts)
-        fig, ax = plt.subplots()
-        ax.imshow(wordcloud, interpolation="bilinear")
-        ax.axis("off")
-        st.pyplot(fig)
-    except Exception as e:
-        logger.error(f"Error generating word cloud: {str(e)}")
-        st.warning("Unable to generate word cloud due to text rendering issues.")
-else:
-    st.warning("No entities found for the selected filters.")
+render_entity_sections(news_df, entities)
 
-# News Sentiment Proportion (Second Section)
+# News Sentiment Proportion
 st.subheader("🌍 News Sentiment Proportion")
 if not news_df.empty:
     sentiment_counts = news_df['sentiment'].value_counts().reset_index()
@@ -168,48 +207,13 @@ if not news_df.empty:
 else:
     st.warning("No sentiment data available.")
 
-# Unified Named Entity Explorer
-st.subheader("🧠 Named Entity Explorer")
-st.markdown("Explore all named entities (people, organizations, locations, events) in India's top news, stock market updates, and events.")
-entity_data = []
-for entity, entity_type in [e for e in entities if e[1] in entity_type]:
-    entity_articles = news_df[news_df['full_text'].str.contains(re.escape(entity), case=False, na=False)]
-    avg_sentiment = entity_articles['sentiment_score'].mean() if not entity_articles.empty else 0.0
-    entity_data.append({
-        'Entity': entity,
-        'Type': entity_type,
-        'Frequency': entities.count((entity, entity_type)),
-        'Avg Sentiment': round(avg_sentiment, 3)
-    })
-
-entity_df = pd.DataFrame(entity_data).drop_duplicates(subset=['Entity', 'Type'])
-entity_df = entity_df.groupby(['Entity', 'Type']).agg({
-    'Frequency': 'sum',
-    'Avg Sentiment': 'mean'
-}).reset_index().sort_values('Frequency', ascending=False)
-st.dataframe(entity_df.head(20), use_container_width=True)
-
-# Entity Frequency Chart
-st.subheader("📈 Top Named Entities")
-entity_freq = pd.DataFrame(get_top_entities([e for e in entities if e[1] in entity_type], top_n=20), columns=["Entity", "Frequency"])
-if not entity_freq.empty:
-    bar_chart = alt.Chart(entity_freq).mark_bar().encode(
-        x=alt.X("Frequency:Q", title="Frequency"),
-        y=alt.Y("Entity:N", sort="-x", title="Entity"),
-        tooltip=["Entity", "Frequency"],
-        color=alt.Color("Frequency:Q", scale=alt.Scale(scheme="blues"))
-    ).properties(height=400, title="Top 20 Named Entities")
-    st.altair_chart(bar_chart, use_container_width=True)
-else:
-    st.warning("No entities match the selected filters.")
-
 # Optimized Geographic Visualization
 st.subheader("🗺️ Geographic Insights")
 try:
     map_html = create_geo_map([e for e in entities if e[1] == "GPE"])
     st.components.v1.html(map_html, height=300)
 except Exception as e:
-    logger.error(f"Error in geo-visualization: {str(e)}")
+    logger.error("Error in geo-visualization: %s", e)
     st.warning("Unable to generate geographic map at this time.")
 
 # Improved News Articles Table
@@ -221,17 +225,17 @@ if not news_df.empty:
     for col in ['title', 'desc', 'date', 'sentiment', 'link']:
         if col not in display_df.columns:
             display_df[col] = ''
-    logger.info(f"display_df shape: {display_df.shape}")
+    logger.info("display_df shape: %s", display_df.shape)
     
     # Truncate title and desc for display
-    display_df['title_display'] = display_df['title'].apply(lambda x: x[:50] + '...' if isinstance(x, str) and len(x) > 50 else x)
-    display_df['desc_display'] = display_df['desc'].apply(lambda x: x[:100] + '...' if isinstance(x, str) and len(x) > 100 else x)
+    display_df['title_display'] = truncate_text(display_df['title'], 50)
+    display_df['desc_display'] = truncate_text(display_df['desc'], 100)
     
     # Format date
     try:
         display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d %H:%M')
     except Exception as e:
-        logger.warning(f"Error formatting date: {str(e)}")
+        logger.warning("Error formatting date: %s", e)
         display_df['date'] = display_df['date'].fillna('Unknown')
     
     # Map sentiment to CSS classes
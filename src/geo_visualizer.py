@@ -1,34 +1,81 @@
 import folium
+from folium.plugins import FastMarkerCluster
 from geopy.geocoders import Nominatim
+from geopy.extra.rate_limiter import RateLimiter
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import diskcache
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Coordinates for frequently mentioned places, checked before hitting Nominatim
+GAZETTEER = {
+    'india': (20.5937, 78.9629),
+    'mumbai': (19.0760, 72.8777),
+    'delhi': (28.6139, 77.2090),
+    'new delhi': (28.6139, 77.2090),
+    'bengaluru': (12.9716, 77.5946),
+    'bangalore': (12.9716, 77.5946),
+    'chennai': (13.0827, 80.2707),
+    'kolkata': (22.5726, 88.3639),
+    'hyderabad': (17.3850, 78.4867),
+    'pune': (18.5204, 73.8567),
+    'ahmedabad': (23.0225, 72.5714),
+    'jaipur': (26.9124, 75.7873),
+    'lucknow': (26.8467, 80.9462),
+    'surat': (21.1702, 72.8311),
+    'kanpur': (26.4499, 80.3319),
+    'nagpur': (21.1458, 79.0882),
+}
+
+# Geocoding results persist across sessions so repeat locations skip the network
+geo_cache = diskcache.Cache('.geo_cache')
+geolocator = Nominatim(user_agent="newspulse_geo")
+# Nominatim allows one request per second; errors are raised so they are not cached
+rate_limited_geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1, max_retries=2, swallow_exceptions=False)
+
+# Builds one circle marker per data row ([lat, lon, popup, radius]) on the client
+MARKER_CALLBACK = """function (row) {
+    return L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: row[3], color: "blue", fill: true, fillOpacity: 0.6
+    }).bindPopup(row[2]);
+}"""
+
+@geo_cache.memoize()
+def _lookup_coordinates(name):
+    geo = rate_limited_geocode(name, timeout=5)
+    return (geo.latitude, geo.longitude) if geo else None
+
+def geocode_location(location):
+    key = location.strip().lower()
+    if key in GAZETTEER:
+        return GAZETTEER[key]
+    try:
+        return _lookup_coordinates(key)
+    except Exception as e:
+        logger.warning("Geocoding failed for %s: %s", location, e)
+        return None
+
 def create_geo_map(entities):
     try:
-        geolocator = Nominatim(user_agent="newspulse_geo")
         m = folium.Map(location=[20.5937, 78.9629], zoom_start=5)  # Center on India
         location_counts = Counter([e[0] for e in entities])
-        
-        for location, count in location_counts.items():
-            try:
-                geo = geolocator.geocode(location, timeout=5)
-                if geo:
-                    folium.CircleMarker(
-                        location=[geo.latitude, geo.longitude],
-                        radius=min(count * 3, 15),  # Smaller radius for optimization
-                        popup=f"{location}: {count} mentions",
-                        color="blue",
-                        fill=True,
-                        fill_opacity=0.6
-                    ).add_to(m)
-            except Exception as e:
-                logger.warning(f"Geocoding failed for {location}: {str(e)}")
-                continue
+
+        # Overlap lookup latency; markers are added on this thread since folium maps are not thread-safe
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            coordinates = dict(zip(location_counts, executor.map(geocode_location, location_counts)))
+
+        # Ship all markers as a single JS array instead of one Leaflet layer per location
+        marker_data = [
+            [*coordinates[location], f"{location}: {count} mentions", min(count * 3, 15)]  # Smaller radius for optimization
+            for location, count in location_counts.items()
+            if coordinates.get(location)
+        ]
+        if marker_data:
+            FastMarkerCluster(marker_data, callback=MARKER_CALLBACK).add_to(m)
         
         return m._repr_html_()
     except Exception as e:
-        logger.error(f"Error in create_geo_map: {str(e)}")
+        logger.error("Error in create_geo_map: %s", e)
         return "<p>Unable to generate map</p>"
\ No newline at end of file
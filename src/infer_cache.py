@@ -0,0 +1,49 @@
+import diskcache
+from hashlib import blake2b
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Per-article NLP results, reused whenever the same article text shows up in a later pulse
+infer_cache = diskcache.Cache('./.cache/infer')
+# Entries are dropped after a week so the store does not grow forever
+INFER_CACHE_EXPIRE = 7 * 24 * 60 * 60
+
+def text_key(text):
+    """Stable digest of an article text used as its cache key."""
+    text = text if isinstance(text, str) else ''
+    return blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def cached_inference(namespace, texts, infer, keys=None, default=None):
+    """Return one result per text, running infer only on texts missing from the cache namespace.
+
+    The namespace should name the model and its version so results from an older model are never served.
+    If infer raises, the missing texts get default for this call only and nothing is cached.
+    """
+    if keys is None:
+        keys = [text_key(text) for text in texts]
+    try:
+        results = [infer_cache.get((namespace, key)) for key in keys]
+    except Exception as e:
+        logger.warning("Inference cache lookup failed for '%s': %s", namespace, e)
+        results = [None] * len(texts)
+
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        try:
+            computed = infer([texts[i] for i in misses])
+        except Exception as e:
+            logger.error("Inference failed for '%s': %s", namespace, e)
+            for i in misses:
+                results[i] = default
+            return results
+        for i, result in zip(misses, computed):
+            results[i] = result
+        try:
+            with infer_cache.transact():
+                for i in misses:
+                    infer_cache.set((namespace, keys[i]), results[i], expire=INFER_CACHE_EXPIRE)
+        except Exception as e:
+            logger.warning("Inference cache update failed for '%s': %s", namespace, e)
+    logger.info("Inference cache '%s': %d hits, %d misses", namespace, len(texts) - len(misses), len(misses))
+    return results
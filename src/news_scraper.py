@@ -1,18 +1,17 @@
 from GoogleNews import GoogleNews
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import pyarrow as pa
+import aiohttp
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
 import logging
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pytz
 import random
 import re
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # List of user agents to rotate and avoid blocking
@@ -22,85 +21,138 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36'
 ]
 
+# Only paragraph tags are needed to rebuild the article body
+PARAGRAPH_STRAINER = SoupStrainer('p')
+
+# Upper bound on simultaneous article downloads
+MAX_CONCURRENT_REQUESTS = 20
+REQUEST_TIMEOUT = 10
+
+# Transient server errors are retried with exponential backoff; other HTTP errors fall back to the description
+RETRY_STATUSES = {500, 502, 503, 504}
+RETRY_BACKOFF = 0.3
+
+# Column schema of the DataFrame returned by fetch_news
+ARTICLE_SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('desc', pa.string()),
+    ('link', pa.string()),
+    ('media', pa.string()),
+    ('date', pa.timestamp('us', tz='UTC')),
+    ('full_text', pa.string())
+])
+
+# Descriptions at least this long stand in for the article body when full text is not required
+MIN_DESC_LENGTH = 200
+
 def clean_url(url):
     """Remove Google-specific query parameters from URL."""
+    # Fast path: without path parameters, stripping the query and fragment is a plain slice
+    if isinstance(url, str) and ';' not in url:
+        cut = min((i for i in (url.find('?'), url.find('#')) if i >= 0), default=len(url))
+        return url[:cut] or url
     try:
         parsed_url = urlparse(url)
         cleaned_url = urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path, '', '', ''))
         return cleaned_url if cleaned_url else url
     except Exception as e:
-        logger.warning(f"Error cleaning URL {url}: {str(e)}")
+        logger.warning("Error cleaning URL %s: %s", url, e)
         return url
 
-def parse_article(article_data, max_retries=4):
-    """Helper function to parse article content using requests and BeautifulSoup."""
-    try:
-        url = clean_url(article_data.get('link', ''))
-        if not url or any(domain in url for domain in ['youtube.com', 'twitter.com', 'x.com', 'facebook.com']):
-            logger.warning(f"Skipping invalid URL: {url}")
-            return None
-        for attempt in range(max_retries):
-            try:
-                headers = {'User-Agent': random.choice(USER_AGENTS)}
-                response = requests.get(url, headers=headers, timeout=10)
+def _article_record(article_data, url, full_text):
+    """Build the row stored for an article."""
+    return {
+        'title': article_data.get('title', ''),
+        'desc': article_data.get('desc', ''),
+        'link': url,
+        'media': article_data.get('media', ''),
+        'date': pd.to_datetime(article_data.get('date', ''), errors='coerce', utc=True),
+        'full_text': full_text
+    }
+
+async def fetch_article_html(session, semaphore, url, max_retries=4):
+    """Download article HTML with retries; returns None if the page is unavailable."""
+    for attempt in range(max_retries):
+        try:
+            headers = {'User-Agent': random.choice(USER_AGENTS)}
+            async with semaphore, session.get(url, headers=headers) as response:
+                if response.status >= 400 and response.status not in RETRY_STATUSES:
+                    logger.warning("HTTP %d for %s, skipping", response.status, url)
+                    return None
                 response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                paragraphs = soup.find_all('p')
-                full_text = ' '.join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-                if not full_text or len(full_text.strip()) < 50:
-                    logger.warning(f"Empty or short content for {url}, using description")
-                    return {
-                        'title': article_data.get('title', ''),
-                        'desc': article_data.get('desc', ''),
-                        'link': url,
-                        'media': article_data.get('media', ''),
-                        'date': pd.to_datetime(article_data.get('date', ''), errors='coerce', utc=True),
-                        'full_text': article_data.get('desc', '')
-                    }
-                return {
-                    'title': article_data.get('title', ''),
-                    'desc': article_data.get('desc', ''),
-                    'link': url,
-                    'media': article_data.get('media', ''),
-                    'date': pd.to_datetime(article_data.get('date', ''), errors='coerce', utc=True),
-                    'full_text': full_text
-                }
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code in [403, 404]:
-                    logger.warning(f"HTTP {e.response.status_code} for {url}, skipping")
-                    return {
-                        'title': article_data.get('title', ''),
-                        'desc': article_data.get('desc', ''),
-                        'link': url,
-                        'media': article_data.get('media', ''),
-                        'date': pd.to_datetime(article_data.get('date', ''), errors='coerce', utc=True),
-                        'full_text': article_data.get('desc', '')
-                    }
-                logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(1, 2))
-                continue
-            except Exception as e:
-                logger.warning(f"Attempt {attempt + 1} failed for {url}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(random.uniform(1, 2))
-                continue
-        logger.error(f"Failed to fetch content for {url} after {max_retries} attempts")
-        return {
-            'title': article_data.get('title', ''),
-            'desc': article_data.get('desc', ''),
-            'link': url,
-            'media': article_data.get('media', ''),
-            'date': pd.to_datetime(article_data.get('date', ''), errors='coerce', utc=True),
-            'full_text': article_data.get('desc', '')
-        }
+                # Raw bytes let lxml detect the encoding itself
+                return await response.read()
+        except Exception as e:
+            logger.warning("Attempt %d failed for %s: %s", attempt + 1, url, e)
+            if attempt < max_retries - 1:
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+    logger.error("Failed to fetch content for %s after %d attempts", url, max_retries)
+    return None
+
+def parse_article(article_data, url, html):
+    """Helper function to extract article content from downloaded HTML using BeautifulSoup."""
+    try:
+        if html is None:
+            return _article_record(article_data, url, article_data.get('desc', ''))
+        soup = BeautifulSoup(html, 'lxml', parse_only=PARAGRAPH_STRAINER)
+        paragraph_texts = (p.get_text(strip=True) for p in soup.find_all('p'))
+        full_text = ' '.join(text for text in paragraph_texts if text)
+        if not full_text or len(full_text.strip()) < 50:
+            logger.warning("Empty or short content for %s, using description", url)
+            return _article_record(article_data, url, article_data.get('desc', ''))
+        return _article_record(article_data, url, full_text)
     except Exception as e:
-        logger.error(f"Error processing article {url}: {str(e)}")
+        logger.error("Error processing article %s: %s", url, e)
+        return None
+
+async def _process_article(session, semaphore, article_data, use_full_text):
+    url = clean_url(article_data.get('link', ''))
+    if not url or any(domain in url for domain in ['youtube.com', 'twitter.com', 'x.com', 'facebook.com']):
+        logger.warning("Skipping invalid URL: %s", url)
         return None
+    desc = article_data.get('desc', '')
+    if not use_full_text and len(desc) >= MIN_DESC_LENGTH:
+        return _article_record(article_data, url, desc)
+    html = await fetch_article_html(session, semaphore, url)
+    # Parse off the event loop so other downloads keep progressing
+    return await asyncio.to_thread(parse_article, article_data, url, html)
+
+async def _fetch_articles_async(articles, use_full_text):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    # One pooled session per fetch keeps connections alive across articles from the same site
+    connector = aiohttp.TCPConnector(limit=MAX_CONCURRENT_REQUESTS, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        results = await asyncio.gather(
+            *(_process_article(session, semaphore, article, use_full_text) for article in articles),
+            return_exceptions=True
+        )
+    news_data = []
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error("Error processing article: %s", result)
+        elif result:
+            news_data.append(result)
+    return news_data
 
-def fetch_news(query="", period="1d", min_articles=30):
+def _articles_to_frame(records):
+    """Build an Arrow-backed DataFrame column by column from article records."""
+    arrays = [
+        pa.array([record[field.name] for record in records], type=field.type, from_pandas=True)
+        for field in ARTICLE_SCHEMA
+    ]
+    table = pa.Table.from_arrays(arrays, schema=ARTICLE_SCHEMA)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def _search_google_news(search_query, period):
+    # GoogleNews keeps per-search state, so each query gets its own client
+    logger.debug("Processing query: %s", search_query)
+    googlenews = GoogleNews(lang='en', region='IN', period=period)
+    googlenews.search(search_query)
+    return googlenews.results(sort=True)
+
+def fetch_news(query="", period="1d", min_articles=30, use_full_text=True):
     try:
-        googlenews = GoogleNews(lang='en', region='IN', period=period)
         base_query = "India Top news" if not query else query + "in India"
         # Default search terms when no query is provided
         search_terms = [
@@ -114,53 +166,51 @@ def fetch_news(query="", period="1d", min_articles=30):
         seen_urls = set()
         seen_titles = set()
 
-        for search_query in search_terms:
-            try:
-                logger.debug(f"Processing query: {search_query}")
-                googlenews.clear()
-                googlenews.search(search_query)
-                results = googlenews.results(sort=True)
+        # Run the searches concurrently but merge them here in search_terms order, so the main query
+        # always fills the result first and the seen sets need no locking
+        executor = ThreadPoolExecutor(max_workers=len(search_terms))
+        try:
+            futures = [(term, executor.submit(_search_google_news, term, period)) for term in search_terms]
+            for search_query, future in futures:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    logger.error("Error processing query '%s': %s", search_query, e)
+                    continue
                 if not results:
-                    logger.warning(f"No results found for query '{search_query}'")
+                    logger.warning("No results found for query '%s'", search_query)
                     continue
                 for article in results:
                     url = clean_url(article.get('link', ''))
-                    title = article.get('title', '')
+                    title = article.get('title', '').strip().casefold()
                     if url not in seen_urls and title not in seen_titles:
                         all_articles.append(article)
                         seen_urls.add(url)
                         seen_titles.add(title)
-                logger.info(f"Fetched {len(results)} articles for query '{search_query}'")
-                time.sleep(random.uniform(0.5, 1.5))
-            except Exception as e:
-                logger.error(f"Error processing query '{search_query}': {str(e)}")
-                continue
+                logger.info("Fetched %d articles for query '%s'", len(results), search_query)
+                if len(all_articles) >= min_articles:
+                    break
+        finally:
+            # Don't wait on searches whose results are no longer needed
+            executor.shutdown(wait=False, cancel_futures=True)
 
         unique_articles = all_articles[:min_articles]
-        logger.info(f"Collected {len(unique_articles)} unique articles")
+        logger.info("Collected %d unique articles", len(unique_articles))
 
         if not unique_articles:
             logger.warning("No valid articles after deduplication")
             return pd.DataFrame()
 
-        news_data = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_article = {executor.submit(parse_article, article): article for article in unique_articles}
-            for future in as_completed(future_to_article):
-                result = future.result()
-                if result:
-                    news_data.append(result)
+        news_data = asyncio.run(_fetch_articles_async(unique_articles, use_full_text))
 
         if not news_data:
             logger.warning("No articles processed successfully")
             return pd.DataFrame()
 
-        df = pd.DataFrame(news_data)
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True)
-            df['date'] = df['date'].fillna(datetime.now(pytz.UTC))
-        logger.info(f"Fetched and processed {len(df)} articles")
+        df = _articles_to_frame(news_data)
+        df['date'] = df['date'].fillna(datetime.now(pytz.UTC))
+        logger.info("Fetched and processed %d articles", len(df))
         return df
     except Exception as e:
-        logger.error(f"Error in fetch_news: {str(e)}")
+        logger.error("Error in fetch_news: %s", e)
         return pd.DataFrame()
\ No newline at end of file
@@ -1,13 +1,21 @@
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+import numpy as np
 import logging
+from importlib.metadata import version
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# VADER compound score cut-offs for the Positive and Negative labels
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Inference cache namespace, tied to the installed VADER release so an upgrade starts from an empty cache
+SENTIMENT_CACHE_NAMESPACE = f"sent:vader-{version('vaderSentiment')}"
+
 try:
     analyzer = SentimentIntensityAnalyzer()
 except Exception as e:
-    logger.error(f"Failed to initialize VADER analyzer: {str(e)}")
+    logger.error("Failed to initialize VADER analyzer: %s", e)
     raise
 
 def get_sentiment(text):
@@ -15,19 +23,40 @@ def get_sentiment(text):
         if not isinstance(text, str) or not text.strip():
             return 0.0
         score = analyzer.polarity_scores(text)
-        logger.debug(f"Sentiment score for text: {score['compound']}")
+        logger.debug("Sentiment score for text: %s", score['compound'])
         return score["compound"]
     except Exception as e:
-        logger.error(f"Error in get_sentiment: {str(e)}")
+        logger.error("Error in get_sentiment: %s", e)
         return 0.0
 
+def score_sentiments(texts):
+    """Compound scores for texts as a float array; errors propagate so callers can avoid caching them."""
+    # Syndicated stories and description fallbacks often repeat, so each distinct text is scored once
+    compound_scores = {}
+
+    def score(text):
+        if not isinstance(text, str) or not text.strip():
+            return 0.0
+        if text not in compound_scores:
+            compound_scores[text] = analyzer.polarity_scores(text)["compound"]
+        return compound_scores[text]
+
+    return np.fromiter((score(text) for text in texts), dtype=np.float64, count=len(texts))
+
+def get_sentiments(texts):
+    try:
+        return score_sentiments(texts)
+    except Exception as e:
+        logger.error("Error in get_sentiments: %s", e)
+        return np.zeros(len(texts))
+
 def label_sentiment(score):
     try:
-        if score >= 0.05:
+        if score >= POSITIVE_THRESHOLD:
             return "Positive"
-        elif score <= -0.05:
+        elif score <= NEGATIVE_THRESHOLD:
             return "Negative"
         return "Neutral"
     except Exception as e:
-        logger.error(f"Error in label_sentiment: {str(e)}")
+        logger.error("Error in label_sentiment: %s", e)
         return "Neutral"
\ No newline at end of file
@@ -1,20 +1,145 @@
 from bertopic import BERTopic
+from sentence_transformers import SentenceTransformer
+from datasketch import MinHash, MinHashLSH
+from sklearn.decomposition import PCA
+from umap import UMAP
+from hdbscan import HDBSCAN
+from collections import defaultdict
+from functools import lru_cache
+import torch
+import threading
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_topics(texts):
+# GPU UMAP is optional and only used for corpora too large for PCA
+try:
+    from cuml.manifold import UMAP as CumlUMAP
+except ImportError:
+    CumlUMAP = None
+
+# Same encoder BERTopic picks for English, loaded once and shared with callers that embed texts themselves
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Wire stories repeated across outlets are collapsed to one document before clustering
+NEAR_DUPLICATE_THRESHOLD = 0.85
+MINHASH_PERMUTATIONS = 64
+SHINGLE_SIZE = 5
+# If fewer distinct documents than this survive, the full set is clustered instead
+MIN_DEDUPED_DOCS = 100
+
+# PCA is one BLAS-bound factorisation and keeps enough structure for pulse-sized corpora
+PCA_MAX_DOCS = 5000
+REDUCED_DIMENSIONS = 5
+
+# HDBSCAN's smallest cluster grows with the corpus (sqrt(N), never below BERTopic's default of 10).
+# Larger corpora then yield fewer, broader clusters, which keeps the mutual-reachability work and the
+# pairwise similarities of the 'auto' topic reduction tractable at the cost of merging small niche topics
+MIN_TOPIC_SIZE = 10
+
+# Refitting a shared model is not thread-safe, so concurrent sessions take turns
+_model_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def get_embedding_model():
+    if torch.cuda.is_available():
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cuda")
+        # Fuse the encoder's LayerNorm/GELU/residual kernels. encode() pads each batch to its longest text,
+        # so shapes vary per batch: dynamic shapes let one compiled graph serve them all, and CUDA graphs
+        # (mode="reduce-overhead") are left off because they would re-record and hold memory per shape
+        model[0].auto_model = torch.compile(model[0].auto_model, dynamic=True)
+        # Compile now rather than on the first real request
+        model.encode(["warm up"], show_progress_bar=False)
+        return model
+    # On CPU, ONNX Runtime's fused and constant-folded graph outruns eager PyTorch
+    return SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx")
+
+def embed_texts(texts):
+    """Encode texts with the shared sentence-transformers model."""
+    return get_embedding_model().encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+
+def _minhash(text):
+    words = text.lower().split() if isinstance(text, str) else []
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    minhash = MinHash(num_perm=MINHASH_PERMUTATIONS)
+    minhash.update_batch([shingle.encode('utf-8') for shingle in shingles])
+    return minhash
+
+def _dedupe_near_duplicates(texts):
+    """Map the index of each representative text to the number of texts it stands for."""
+    lsh = MinHashLSH(threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=MINHASH_PERMUTATIONS)
+    member_counts = {}
+    for index, text in enumerate(texts):
+        minhash = _minhash(text)
+        matches = lsh.query(minhash)
+        if matches:
+            member_counts[matches[0]] += 1
+        else:
+            lsh.insert(index, minhash)
+            member_counts[index] = 1
+    return member_counts
+
+def _dimensionality_reducer(n_docs):
+    if n_docs < PCA_MAX_DOCS:
+        return PCA(n_components=REDUCED_DIMENSIONS)
+    if CumlUMAP is not None:
+        return CumlUMAP(n_components=REDUCED_DIMENSIONS, n_neighbors=15, min_dist=0.0)
+    # BERTopic's own default
+    return UMAP(n_neighbors=15, n_components=REDUCED_DIMENSIONS, min_dist=0.0, metric='cosine', low_memory=False)
+
+def _clusterer(n_docs):
+    min_topic_size = max(MIN_TOPIC_SIZE, int(n_docs ** 0.5))
+    # Same settings BERTopic uses for its default HDBSCAN model
+    return HDBSCAN(min_cluster_size=min_topic_size, metric='euclidean', cluster_selection_method='eom', prediction_data=True)
+
+@lru_cache(maxsize=1)
+def _get_bertopic():
+    # Built once and shares the embedding model, so nothing is reloaded between calls.
+    # Per-document topic probabilities are never read, so HDBSCAN's soft-clustering pass is skipped
+    return BERTopic(language="english", embedding_model=get_embedding_model(), calculate_probabilities=False, verbose=False)
+
+def get_topics(texts, embeddings=None):
     try:
         if not texts or not any(isinstance(t, str) and t.strip() for t in texts):
             logger.warning("No valid texts for topic modeling")
             return []
-        model = BERTopic(language="english", calculate_probabilities=True, verbose=False)
-        topics, _ = model.fit_transform(texts)
-        topic_info = model.get_topic_info()
-        topic_data = [(row['Name'], row['Count']) for _, row in topic_info.iterrows() if row['Topic'] != -1]
-        logger.info(f"Identified {len(topic_data)} topics")
-        return topic_data[:10]
+        model = _get_bertopic()
+        # Too few texts to ever leave MIN_DEDUPED_DOCS distinct ones, so skip the hashing
+        member_counts = _dedupe_near_duplicates(texts) if len(texts) >= MIN_DEDUPED_DOCS else None
+        if member_counts is not None and len(member_counts) >= MIN_DEDUPED_DOCS:
+            representatives = list(member_counts)
+            logger.info("Clustering %d of %d texts after removing near-duplicates", len(representatives), len(texts))
+            texts = [texts[i] for i in representatives]
+            if embeddings is not None:
+                embeddings = embeddings[representatives]
+        else:
+            member_counts = None
+        # Callers that already embedded the texts pass them in to skip a second encoder pass
+        if embeddings is None:
+            embeddings = embed_texts(texts)
+        with _model_lock:
+            model.umap_model = _dimensionality_reducer(len(texts))
+            model.hdbscan_model = _clusterer(len(texts))
+            # reduce_topics leaves nr_topics set on the shared model; clear it so fit_transform never reduces on its own
+            model.nr_topics = None
+            topics, _ = model.fit_transform(texts, embeddings=embeddings)
+            # Merge similar topics; BERTopic's 'auto' reduction raises when HDBSCAN found only outliers,
+            # so it runs only once there are at least two topics to merge
+            if len(set(topics) - {-1}) > 1:
+                model.reduce_topics(texts, nr_topics="auto")
+                topics = model.topics_
+            topic_info = model.get_topic_info()
+        if member_counts is not None:
+            # Each representative counts once for every near-duplicate it replaced
+            topic_counts = defaultdict(int)
+            for topic, weight in zip(topics, member_counts.values()):
+                topic_counts[topic] += weight
+            topic_info['Count'] = topic_info['Topic'].map(topic_counts).fillna(0).astype(int)
+            topic_info = topic_info.sort_values('Count', ascending=False)
+        topics_found = topic_info[topic_info['Topic'] != -1]
+        logger.info("Identified %d topics", len(topics_found))
+        top_topics = topics_found.head(10)
+        return list(zip(top_topics['Name'].tolist(), top_topics['Count'].tolist()))
     except Exception as e:
-        logger.error(f"Error in topic modeling: {str(e)}")
+        logger.error("Error in topic modeling: %s", e)
         return []
\ No newline at end of file
@@ -1,9 +1,13 @@
 import pandas as pd
-from sentiment_analyzer import get_sentiment, label_sentiment
-from ner_analyzer import extract_entities
+import numpy as np
+import ahocorasick
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from sentiment_analyzer import score_sentiments, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD, SENTIMENT_CACHE_NAMESPACE
+from ner_analyzer import extract_entities_by_text, NER_CACHE_NAMESPACE
+from infer_cache import cached_inference, text_key
 import logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 def process_news(news_df):
@@ -12,17 +16,69 @@ def process_news(news_df):
             logger.warning("Empty news DataFrame received")
             return news_df, []
         
+        # Arrow-backed strings let the fills and masks below run as Arrow kernels
+        news_df = news_df.astype({'desc': 'string[pyarrow]', 'full_text': 'string[pyarrow]'}, copy=False)
         news_df['desc'] = news_df['desc'].fillna('')
         news_df['full_text'] = news_df['full_text'].fillna(news_df['desc'])
         
-        # Apply sentiment analysis on full_text for better accuracy
-        news_df['sentiment_score'] = news_df['full_text'].apply(get_sentiment)
-        news_df['sentiment'] = news_df['sentiment_score'].apply(label_sentiment)
-        
-        # Extract entities from full_text for richer context
-        all_entities = extract_entities(news_df['full_text'].tolist())
-        logger.info(f"Processed {len(news_df)} articles with {len(all_entities)} entities")
+        # Only rows with some text go through inference; the rest keep a neutral score and no entities
+        has_text = news_df['full_text'].str.strip().str.len().to_numpy(dtype=np.int64, na_value=0) > 0
+        text_rows = np.flatnonzero(has_text)
+        # Built once and shared by both stages, along with their cache keys
+        texts = news_df['full_text'].iloc[text_rows].tolist()
+        keys = [text_key(text) for text in texts]
+
+        # Sentiment and NER are independent, so run them side by side;
+        # spaCy's numeric kernels release the GIL while VADER scores
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Apply sentiment analysis on full_text for better accuracy
+            sentiment_future = executor.submit(cached_inference, SENTIMENT_CACHE_NAMESPACE, texts, lambda batch: score_sentiments(batch).tolist(), keys, 0.0)
+            # Extract entities from full_text for richer context
+            entities_future = executor.submit(cached_inference, NER_CACHE_NAMESPACE, texts, extract_entities_by_text, keys, [])
+
+            scores = np.zeros(len(news_df), dtype=np.float64)
+            scores[text_rows] = sentiment_future.result()
+            news_df['sentiment_score'] = scores
+            # Vectorized equivalent of label_sentiment
+            news_df['sentiment'] = np.select(
+                [scores >= POSITIVE_THRESHOLD, scores <= NEGATIVE_THRESHOLD],
+                ['Positive', 'Negative'],
+                default='Neutral'
+            )
+
+            entities_by_text = entities_future.result()
+        all_entities = [entity for text_entities in entities_by_text for entity in text_entities]
+        logger.info("Processed %d articles with %d entities", len(news_df), len(all_entities))
         return news_df, all_entities
     except Exception as e:
-        logger.error(f"Error in process_news: {str(e)}")
-        return news_df, []
\ No newline at end of file
+        logger.error("Error in process_news: %s", e)
+        return news_df, []
+
+def compute_entity_sentiment(news_df, entities):
+    """Average sentiment per (entity, type), matching all entities in one Aho-Corasick pass per article."""
+    try:
+        keys = {e[0].lower() for e in entities if e[0]}
+        if news_df.empty or not keys:
+            return {}
+        automaton = ahocorasick.Automaton()
+        for key in keys:
+            automaton.add_word(key, key)
+        automaton.make_automaton()
+
+        sums = defaultdict(float)
+        counts = defaultdict(int)
+        for text, score in zip(news_df['full_text'], news_df['sentiment_score']):
+            if not isinstance(text, str):
+                continue
+            # Count each article once per entity, however often it is mentioned
+            for key in {key for _, key in automaton.iter(text.lower())}:
+                sums[key] += score
+                counts[key] += 1
+
+        return {
+            e: sums[e[0].lower()] / counts[e[0].lower()] if counts[e[0].lower()] else 0.0
+            for e in entities
+        }
+    except Exception as e:
+        logger.error("Error in compute_entity_sentiment: %s", e)
+        return {}